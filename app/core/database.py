@@ -1,6 +1,9 @@
 import os, ssl
-from typing import Generator
-from sqlmodel import create_engine, SQLModel, Session
+from typing import Any, AsyncGenerator
+import orjson
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
 
 
@@ -15,6 +18,28 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in .env file or environment variables")
 
+# 2.2 改用非同步驅動 (asyncmy)
+# 相容舊的 mysql:// 或 mysql+pymysql:// 設定，統一換成 mysql+asyncmy://
+for _sync_scheme in ("mysql+pymysql://", "mysql://"):
+    if DATABASE_URL.startswith(_sync_scheme):
+        DATABASE_URL = "mysql+asyncmy://" + DATABASE_URL[len(_sync_scheme):]
+        break
+
+# 2.3 是否印出 SQL (預設關閉)
+# echo 會在每個查詢格式化並印出 SQL 與參數，成本很高，只在除錯時用 SQL_ECHO=1 開啟
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
+
+# 2.4 連線池設定 (可由環境變數調整)
+# 預設 5 + 10 在高併發下容易耗盡連線 (QueuePool limit reached)，這裡明確放大
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "20"))
+
+# 2.5 JSON 欄位序列化 (改用 orjson，C 實作，比標準庫 json 快很多)
+# SQLAlchemy 期待 serializer 回傳 str，orjson.dumps 回傳 bytes，所以要 decode
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
 # 這些只是為了aiven，後續上線不用管它們
 # --- (核心修改) 建立自定義 SSL Context ---
 # 目的：允許加密連線，但跳過對 Aiven 自簽名憑證的驗證
@@ -22,30 +47,52 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE    
 
-# 3. 建立 Engine
-# pool_recycle=3600: 每小時自動回收連線，防止 MySQL 閒置過久斷線
+# 3. 建立 Async Engine
+# 每個請求只佔用一個 coroutine，不再佔用 threadpool 的 worker
+# pool_recycle=1800: 每 30 分鐘自動回收連線，防止 MySQL 閒置過久斷線
 # pool_pre_ping=True: 針對 Aiven 雲端資料庫建議開啟，連線前會先測試有效性
-# echo=True: 開發時顯示 SQL，上線部署時可改為 False
-engine = create_engine(
+# pool_size / max_overflow / pool_timeout: 見 2.4，連線池滿時最多等待 pool_timeout 秒
+# echo=SQL_ECHO: 預設不顯示 SQL，開發時設定 SQL_ECHO=1 即可開啟
+engine = create_async_engine(
     DATABASE_URL, 
-    echo=True, 
-    pool_recycle=3600,
+    echo=SQL_ECHO, 
+    pool_recycle=1800,
     pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    # JSON 欄位 (names, organizer_info) 讀寫都走 orjson
+    json_serializer=_orjson_dumps,
+    json_deserializer=orjson.loads,
     # 將 ssl_context 傳入 connect_args
     connect_args={"ssl": ssl_context}
 )
 
+# 3.1 建立 Session 工廠
+# expire_on_commit=False: commit 後不讓物件屬性失效，避免轉 DTO 時再次觸發查詢 (async 下無法 lazy load)
+# autoflush=False: 讀取為主，不在每次查詢前自動 flush
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+# =========================================================
+# [重要] 必須 import 所有的 Model，SQLModel.metadata 才會註冊到這些表格
+# event_model 只依賴 constants，不會反過來 import 這個模組，所以放在模組層級即可 (只執行一次)
+# =========================================================
+from app.models import event_model  # noqa: F401
+
 # 4. 建立資料庫和表格
-def create_db_and_tables():
-    # =========================================================
-    # [重要] 必須在這裡 import 所有的 Model
-    # =========================================================
-    from app.models.event_model import Event, EventCategory, EventTranslation, EventAttachment
-    
-    # 開始建立表格
-    SQLModel.metadata.create_all(engine)
+# 只給本機開發用 (見 main.py 的 AUTO_CREATE_TABLES)；正式環境的表格結構由資料庫遷移管理
+async def create_db_and_tables():
+    # 開始建立表格 (metadata.create_all 是同步 API，需透過 run_sync 執行)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
 
 # 5. 提供資料庫會話 (Dependency)
-def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+# async with 離開時會自動 close，把連線還給連線池
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        yield session
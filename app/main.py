@@ -1,8 +1,10 @@
 import uvicorn
 import os
 from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 # 1. 引入您的資料庫核心設定
@@ -12,14 +14,27 @@ from app.core.database import create_db_and_tables
 # 2. 引入 Router
 from app.routers import event_router
 
+# 是否在啟動時自動建立資料庫表格 (預設關閉，本機開發可設定 AUTO_CREATE_TABLES=1)
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "0") == "1"
+
+# 上傳檔案目錄
+UPLOADS_DIR = Path("uploads")
+
+# 是否由 FastAPI 自己提供 /uploads 靜態檔案 (預設開啟)
+# 前面有 nginx / CDN 時設定 SERVE_STATIC=0，讓反向代理用 sendfile 直接送檔，不佔用 Python worker
+# 例：location /uploads/ { alias /app/uploads/; sendfile on; tcp_nopush on; expires 30d; }
+SERVE_STATIC = os.getenv("SERVE_STATIC", "1") == "1"
+
 # =========================================================
 # 生命週期管理 (Lifespan Events)
 # =========================================================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 啟動時執行：自動建立資料庫表格 (對應 SQLModel table=True 的模型)
-    print("🚀 System starting up... Creating database tables...")
-    # create_db_and_tables()
+    print("🚀 System starting up...")
+    if AUTO_CREATE_TABLES:
+        print("🛠️ Creating database tables...")
+        await create_db_and_tables()
     yield
     # 關閉時執行 (如果需要釋放資源寫在這裡)
     print("🛑 System shutting down...")
@@ -31,7 +46,9 @@ app = FastAPI(
     title="Event Management System API",
     version="1.0.0",
     description="Backend API for managing events, categories, and translations.",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # 預設回應改用 orjson 序列化 (原生支援 datetime，比標準庫 json 快)
+    default_response_class=ORJSONResponse
 )
 
 # =========================================================
@@ -45,16 +62,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 讓前端 JS 讀得到分頁 cursor 與 ETag
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # =========================================================
 # 掛載靜態檔案目錄
 # =========================================================
-# 確保上傳目錄存在，避免報錯
-os.makedirs("uploads", exist_ok=True)
+if SERVE_STATIC:
+    # 確保上傳目錄存在，避免報錯
+    UPLOADS_DIR.mkdir(exist_ok=True)
 
-# 讓 /uploads/abc.jpg 可以被外部訪問
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    # 讓 /uploads/abc.jpg 可以被外部訪問
+    app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
 
 # =========================================================
 # 註冊 Router (路由)
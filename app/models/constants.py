@@ -7,4 +7,7 @@ class EventStatus:
 class AttachmentType:
     IMAGE = "image"
     FILE = "file"
-    LINK = "link"
\ No newline at end of file
+    LINK = "link"
+
+# 預設語系：指定語言找不到翻譯時的降級目標
+DEFAULT_LOCALE = "zh-TW"
@@ -1,7 +1,7 @@
 # app/models/event_model.py
 from typing import Optional, Dict, List
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import JSON, UniqueConstraint, ForeignKey, Text  # 處理 JSON 欄位
+from sqlalchemy import JSON, UniqueConstraint, ForeignKey, Text, Index, Column, DateTime, FetchedValue, text  # 處理 JSON 欄位
 from datetime import datetime  # 處理時間
 from enum import IntEnum, Enum # 處理狀態碼 & 附件類型
 from app.models.constants import EventStatus, AttachmentType
@@ -36,6 +36,18 @@ class EventCategory(SQLModel, table=True):
 class Event(SQLModel, table=True):
     __tablename__ = "events"
 
+    # 複合索引：對應列表查詢的 WHERE status / deleted_at + ORDER BY published_at DESC, id DESC
+    # 讓 MySQL 走索引範圍掃描 (反向掃描即為 DESC, DESC)，不用全表掃描 + filesort
+    # 既有資料庫的 DDL 見 db/migrations.sql
+    __table_args__ = (
+        Index("ix_events_list", "status", "deleted_at", "published_at", "id"),
+    )
+
+    # created_at / updated_at 由資料庫產生 (見下方系統時間欄位)
+    # eager_defaults=True：INSERT / UPDATE 後立即把這些值讀回物件，
+    # 否則屬性會被標記為過期，在 async session 下讀取會觸發 lazy load 而報錯 (MissingGreenlet)
+    __mapper_args__ = {"eager_defaults": True}
+
     # id: 對應 BIGINT UNSIGNED
     # 雖然 Python 只有 int，但 SQLAlchemy 底層能處理 BIGINT
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -44,6 +56,12 @@ class Event(SQLModel, table=True):
     # 重點：foreign_key="表名稱.欄位名稱"
     category_id: int = Field(foreign_key="event_categories.id") # 這也是為什麼要先定義 EventCategory
 
+    # slug: 前端路由用的網址識別碼，格式為 "{分類 slug}-{活動 id}" (例如 speech-42)
+    # 存成有唯一索引的欄位，列表不必每筆重組字串，也能直接用 slug 查詢
+    # 既有資料由 db/migrations.sql 回填；之後實作新增活動 API 時，要在取得 id 後填入並清除列表快取
+    # Optional 是因為 INSERT 當下還沒有 id，尚未填入的資料由 Service 臨時合成
+    slug: Optional[str] = Field(default=None, max_length=80, unique=True, index=True)
+
     # status: 狀態
     # 這裡我們直接使用剛剛定義的 EventStatus 型別，SQLModel 會自動存成整數
     status: int = Field(
@@ -67,12 +85,27 @@ class Event(SQLModel, table=True):
     is_featured: bool = Field(default=False)
 
     # --- 系統時間欄位 ---
-    # 這裡我們使用 default_factory=datetime.now，讓 Python 在建立物件時自動填入當前時間
-    created_at: Optional[datetime] = Field(default_factory=datetime.now)
+    # 交給資料庫產生時間 (DEFAULT CURRENT_TIMESTAMP)，Python 端不再建立 datetime 物件
+    # 寫入後的值會透過 eager_defaults 讀回 (見 __mapper_args__)
+    # 既有資料庫需先補上欄位預設值，DDL 見 db/migrations.sql
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False)
+    )
     
-    # updated_at 的自動更新通常由資料庫層級 (ON UPDATE CURRENT_TIMESTAMP) 處理
-    # 但為了讓 Python 物件也能拿到值，我們先設為 Optional
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now)
+    # updated_at：由 MySQL 的 ON UPDATE CURRENT_TIMESTAMP 維護
+    # 不論是否透過 ORM (例如直接在資料庫修改)，每次 UPDATE 都會更新
+    # server_onupdate=FetchedValue() 告訴 SQLAlchemy 這個值由資料庫產生，UPDATE 後要讀回
+    # 為了讓 Python 物件在寫入前也能建立，我們先設為 Optional
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(
+            DateTime,
+            server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+            server_onupdate=FetchedValue(),
+            nullable=False
+        )
+    )
     
     # 邏輯刪除欄位
     deleted_at: Optional[datetime] = Field(default=None)
@@ -84,7 +117,10 @@ class Event(SQLModel, table=True):
     # 這裡使用 cascade="all, delete-orphan" 來同步 Python 層面的刪除行為(當活動刪除時，相關翻譯也會被刪除)
     translations: List["EventTranslation"] = Relationship(
         back_populates="event", 
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "order_by": "EventTranslation.id" # 固定順序，讓「降級取第一筆翻譯」在列表與詳情一致
+            }
     )
     # Relationship: 一個活動有多個附件
     attachments: List["EventAttachment"] = Relationship(
@@ -133,6 +169,12 @@ class EventTranslation(SQLModel, table=True):
 class EventAttachment(SQLModel, table=True):
     __tablename__ = "event_attachments"
 
+    # 複合索引：依活動取附件並依 sort_order 排序
+    # (event_translations 的 (event_id, locale) 已由 uniq_event_locale 涵蓋)
+    __table_args__ = (
+        Index("ix_event_attachments_event_sort", "event_id", "sort_order"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # 外鍵：連結回主表 Events
@@ -1,51 +1,156 @@
 # app/repositories/event_repository.py
-from typing import List, Optional
-from sqlmodel import Session, select, col
-from sqlalchemy.orm import selectinload # 這是解決效能問題的關鍵
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import lambda_stmt, or_, and_
+from sqlalchemy.orm import selectinload, load_only # 這是解決效能問題的關鍵
 
 # 引入模型
-from app.models.event_model import Event, EventStatus
+from app.models.event_model import Event, EventTranslation
+from app.models.constants import EventStatus, DEFAULT_LOCALE
+
+# 已發布狀態碼，模組載入時綁定一次，組查詢時不用再查屬性
+_PUBLISHED = EventStatus.PUBLISHED
 
 class EventRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         """
         依賴注入 (Dependency Injection):
         Repository 不需要知道資料庫怎麼連線，它只要一個已經連好的 session。
         """
         self.session = session
 
+    # 列表排序 + 分頁
+    def _paginate(self, statement, skip: int, limit: int, cursor: Optional[Tuple[Optional[datetime], int]]):
+        """
+        statement: lambda_stmt 建立的查詢，這裡用 += lambda 接上排序與分頁
+        (lambda 只在第一次執行時建立查詢，之後只換綁定參數 skip / limit / cursor)
+        排序：最新發布的在前面，同時間再依 id 排序，讓順序穩定 (keyset 分頁需要)
+        分頁：
+        - 有 cursor (上一頁最後一筆的 (published_at, id))：keyset 分頁，走索引直接定位，不必掃過前面的資料
+        - 沒有 cursor：沿用舊的 OFFSET 分頁 (頁數越深越慢)
+        published_at 可能是 NULL：MySQL 的 DESC 排序會把 NULL 排在最後，
+        cursor 條件也要照這個順序把 NULL 的資料接在後面，兩種分頁才會拿到同一批資料
+        """
+        statement += lambda s: s.order_by(col(Event.published_at).desc(), col(Event.id).desc())
+        if cursor is not None:
+            cursor_published_at, cursor_id = cursor
+            if cursor_published_at is not None:
+                # 還在有發布時間的區段：比它舊的 + 所有 NULL 的資料
+                # 不用 (published_at, id) < (...) 的 row constructor 寫法：
+                # MySQL 的 range optimizer 無法用它在索引上定位，會退化成從最新一筆往回掃
+                # 拆成 published_at < ts OR (published_at = ts AND id < id) 才能建立索引範圍
+                statement += lambda s: s.where(
+                    or_(
+                        col(Event.published_at) < cursor_published_at,
+                        and_(col(Event.published_at) == cursor_published_at, col(Event.id) < cursor_id),
+                        col(Event.published_at).is_(None)
+                    )
+                )
+            else:
+                # 已經進入 NULL 區段：只剩 id 比較小的 NULL 資料
+                statement += lambda s: s.where(
+                    and_(col(Event.published_at).is_(None), col(Event.id) < cursor_id)
+                )
+        else:
+            statement += lambda s: s.offset(skip)
+        statement += lambda s: s.limit(limit)
+        return statement
+
     # 取得活動列表
-    def get_list(self, skip: int = 0, limit: int = 10) -> List[Event]:
+    async def get_list(
+        self, skip: int = 0, limit: int = 10, cursor: Optional[Tuple[Optional[datetime], int]] = None
+    ) -> List[Event]:
         """
         取得活動列表
         條件：未軟刪除 + 已發布 + 依照發布時間排序
+        cursor: 上一頁最後一筆的 (published_at, id)，有傳就忽略 skip (見 _paginate)
+        注意：只預先載入 category，translations 不會被載入 (翻譯請用 get_list_with_locale 另外查)
         """
-        statement = (
+        # 查詢用 lambda_stmt 包起來：SQLAlchemy 會快取整個查詢結構，之後的請求只換綁定參數
+        statement = lambda_stmt(lambda: (
             select(Event)
             # 1. 過濾軟刪除 (deleted_at 為 Null 代表未刪除)
             .where(Event.deleted_at == None)
             # 2. 過濾狀態 (只顯示已發布)
-            .where(Event.status == EventStatus.PUBLISHED)
+            .where(Event.status == _PUBLISHED)
             # 3. 預先載入關聯資料 (Eager Loading)
             # 如果不寫這個，Service 層跑迴圈讀取 event.category 時，會瘋狂連資料庫
-            .options(
-                selectinload(Event.category),
-                selectinload(Event.translations),
-                # 列表頁可能需要縮圖，所以先把附件也抓出來 (視情況優化)
-                selectinload(Event.attachments)
-            )
-            # 4. 排序 (最新發布的在前面)
-            .order_by(col(Event.published_at).desc())
-            # 5. 分頁
-            .offset(skip)
-            .limit(limit)
-        )
+            # 列表 DTO (EventListView) 沒有附件欄位，所以不載入 attachments，省下一次 SELECT
+            # 若日後需要縮圖，改用 selectinload(Event.attachments).load_only(EventAttachment.path, EventAttachment.type)
+            # 翻譯改由 get_list_with_locale 在 SQL 端過濾語系後另外查，這裡不載入
+            .options(selectinload(Event.category))
+        ))
+        # 4. 排序 + 分頁
+        statement = self._paginate(statement, skip, limit, cursor)
         
-        results = self.session.exec(statement).all()
+        # lambda_stmt 回傳的是 Row，要用 scalars() 取回 Event 物件
+        results = (await self.session.exec(statement)).scalars().all()
         return results
 
+    # 取得活動列表 + 指定語系的翻譯
+    async def get_list_with_locale(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        locale: str = DEFAULT_LOCALE,
+        cursor: Optional[Tuple[Optional[datetime], int]] = None
+    ) -> Tuple[List[Event], List[EventTranslation]]:
+        """
+        取得活動列表，翻譯改由第二個查詢在 SQL 端過濾語系
+        每個活動最多只會拿回 (指定語言, 預設語言) 兩筆翻譯，而不是所有語系
+        兩種語系都沒有翻譯的活動，再補查一次該活動的所有翻譯 (依 id 排序)，讓 Service 能降級取第一筆
+        cursor: 上一頁最後一筆的 (published_at, id)，有傳就忽略 skip (見 _paginate)
+        回傳：(活動列表, 翻譯列表)；活動的 translations 關聯不會被載入
+        """
+        # 1. 主查詢：直接沿用 get_list (不載入 translations)
+        events = await self.get_list(skip=skip, limit=limit, cursor=cursor)
+
+        event_ids = [event.id for event in events]
+        if not event_ids:
+            return events, []
+
+        # 2. 翻譯查詢：只取這一頁的活動 + 需要的語系 + 列表需要的欄位
+        # event_ids / locales 會變成 IN (...) 的綁定參數
+        locales = (locale, DEFAULT_LOCALE)
+        trans_statement = lambda_stmt(lambda: (
+            select(EventTranslation)
+            .where(col(EventTranslation.event_id).in_(event_ids))
+            .where(col(EventTranslation.locale).in_(locales))
+            .options(
+                load_only(
+                    EventTranslation.event_id,
+                    EventTranslation.locale,
+                    EventTranslation.title
+                )
+            )
+        ))
+        translations = list((await self.session.exec(trans_statement)).scalars().all())
+
+        # 3. 降級查詢：指定語言與預設語言都沒有翻譯的活動 (通常沒有，不會多一次查詢)
+        # 與詳情頁的規則一致：再找不到就拿第一筆翻譯
+        matched_ids = {t.event_id for t in translations}
+        missing_ids = [event_id for event_id in event_ids if event_id not in matched_ids]
+        if missing_ids:
+            fallback_statement = lambda_stmt(lambda: (
+                select(EventTranslation)
+                .where(col(EventTranslation.event_id).in_(missing_ids))
+                .options(
+                    load_only(
+                        EventTranslation.event_id,
+                        EventTranslation.locale,
+                        EventTranslation.title
+                    )
+                )
+                .order_by(col(EventTranslation.id))
+            ))
+            translations += (await self.session.exec(fallback_statement)).scalars().all()
+
+        return events, translations
+
     # 取得單一活動詳情
-    def get_by_id(self, event_id: int) -> Optional[Event]:
+    async def get_by_id(self, event_id: int) -> Optional[Event]:
         """
         取得單一活動詳情
         """
@@ -53,7 +158,7 @@ class EventRepository:
             select(Event)
             .where(Event.id == event_id)
             .where(Event.deleted_at == None) # 同樣要檢查軟刪除
-            .where(Event.status == EventStatus.PUBLISHED)
+            .where(Event.status == _PUBLISHED)
             # 詳情頁需要所有關聯資料
             .options(
                 selectinload(Event.category),
@@ -62,5 +167,5 @@ class EventRepository:
             )
         )
         
-        result = self.session.exec(statement).first()
+        result = (await self.session.exec(statement)).first()
         return result
\ No newline at end of file
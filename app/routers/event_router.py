@@ -1,7 +1,7 @@
 # app/routers/event_router.py
-from typing import List
-from fastapi import APIRouter, Depends, Query, Path
-from sqlmodel import Session
+import hashlib
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Path, Request, Response
 
 # 1. 引入必要元件
 from app.core.database import get_session  
@@ -15,27 +15,66 @@ from app.dependencies import get_event_service
 # tags=["Events"]: 在 Swagger UI 文件中分類標籤
 router = APIRouter(prefix="/events", tags=["Events"])
 
+# 列表的瀏覽器/CDN 快取時間 (秒)，與 Service 層的 TTL 快取一致
+LIST_CACHE_MAX_AGE = 30
+
+# ==========================================
+# Helpers
+# ==========================================
+def _compute_etag(payload: bytes) -> str:
+    """
+    依回應內容 (JSON bytes) 計算 ETag，內容不變 ETag 就不變
+    """
+    return '"' + hashlib.blake2b(payload).hexdigest()[:16] + '"'
+
 # ==========================================
 # API Endpoints
 # ==========================================
-@router.get("/", response_model=List[EventListView])
-def read_events(
+# Service 已經用 TypeAdapter 把整頁序列化好，這裡不再經過 response_model 驗證
+# responses 只是讓 Swagger 文件仍然顯示回應格式
+@router.get(
+    "/",
+    response_model=None,
+    responses={200: {"model": List[EventListView]}}
+)
+async def read_events(
+    # 讀取 If-None-Match 用
+    request: Request,
     # Query Parameters (?key=value)
     locale: str = Query("zh-TW", max_length=10, description="語言代碼 (zh-TW, en-US)"),
     page: int = Query(1, ge=1, description="頁碼，從 1 開始"),
     size: int = Query(10, ge=1, le=100, description="每頁筆數 (Max: 100)"),
+    cursor: Optional[str] = Query(None, description="下一頁 cursor (取自上一頁回應的 X-Next-Cursor header)，有傳就忽略 page"),
     # 注入 Service
     service: EventService = Depends(get_event_service)
 ):
     """
     取得活動列表 (支援分頁與多語系)
+    支援 ETag：內容沒變時回傳 304，前端可直接沿用快取
+    分頁：舊的 ?page= 仍可用；深頁數建議改用 ?cursor= (下一頁 cursor 放在 X-Next-Cursor header)
     """
     # 這裡直接呼叫 Service，不需要管資料庫怎麼查、DTO 怎麼轉
-    return service.get_events(locale=locale, page=page, page_size=size)
+    payload, next_cursor = await service.get_events(
+        locale=locale, page=page, page_size=size, cursor=cursor
+    )
+
+    etag = _compute_etag(payload)
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={LIST_CACHE_MAX_AGE}",
+    }
+    if next_cursor:
+        cache_headers["X-Next-Cursor"] = next_cursor
+
+    # 前端帶來的 ETag 與目前內容相同 -> 304 Not Modified，不用再傳內容
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+
+    return Response(content=payload, media_type="application/json", headers=cache_headers)
 
 
 @router.get("/{event_id}", response_model=EventDetailView)
-def read_event_detail(
+async def read_event_detail(
     # Path Parameters (/events/1)
     event_id: int = Path(..., description="活動 ID"),
     # Query Parameters
@@ -47,4 +86,4 @@ def read_event_detail(
     取得單一活動詳情
     """
     # 如果找不到，Service 層會拋出 HTTPException，這裡不需要 try-except
-    return service.get_event_detail(event_id=event_id, locale=locale)
\ No newline at end of file
+    return await service.get_event_detail(event_id=event_id, locale=locale)
\ No newline at end of file
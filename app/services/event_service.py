@@ -1,51 +1,130 @@
 # app/services/event_service.py
-from typing import List, Optional
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from cachetools import TTLCache
 from fastapi import HTTPException
-from sqlmodel import Session
-from app.models.event_model import Event, EventStatus
-from app.schemas.event_schema import EventListView, EventDetailView, CategoryPublic, AttachmentPublic
+from pydantic import TypeAdapter
+from app.models.event_model import Event, EventTranslation
+from app.models.constants import DEFAULT_LOCALE
+from app.schemas.event_schema import EventListView
 from app.repositories.event_repository import EventRepository
 
+# 活動列表快取 (行程內、短時間)
+# key: (locale, page, page_size, cursor)；value: (已序列化的 JSON bytes, 下一頁 cursor)
+# 列表只有管理者編輯活動時才會變動，30 秒內的重複請求不需要再查資料庫
+_LIST_CACHE: TTLCache = TTLCache(maxsize=256, ttl=30)
+
+# 整頁列表 (plain dict) 一次交給 pydantic_core (Rust) 驗證並序列化成 JSON
+# 不必每筆各自建立 EventListView / CategoryPublic
+_LIST_ADAPTER = TypeAdapter(List[EventListView])
+
+def invalidate_event_list_cache() -> None:
+    """
+    清空活動列表快取
+    之後實作新增/修改/刪除活動時，寫入完成後要呼叫這個函式
+    """
+    _LIST_CACHE.clear()
+
+# ==========================================
+# Keyset 分頁 cursor 編碼
+# ==========================================
+# cursor 內容是上一頁最後一筆的 (published_at, id)，用 base64 包起來讓前端當作不透明字串
+# published_at 為 NULL 時以空字串表示
+def encode_cursor(published_at: Optional[datetime], event_id: int) -> str:
+    raw = f"{published_at.isoformat() if published_at else ''}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    解析前端傳回的 cursor，格式錯誤時回 400
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        published_at, event_id = raw.split("|")
+        return (datetime.fromisoformat(published_at) if published_at else None), int(event_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 class EventService:
     # 初始化 Service，注入 Repository
     def __init__(self, repository: EventRepository):
         self.repository = repository
 
-    def get_events(self, locale: str, page: int = 1, page_size: int = 10) -> List[EventListView]:
+    async def get_events(
+        self, locale: str, page: int = 1, page_size: int = 10, cursor: Optional[str] = None
+    ) -> Tuple[bytes, Optional[str]]:
         """
         取得活動列表 (包含多語系轉換邏輯)
         參數：
         - locale: 語言代碼 (如 "zh-TW", "en-US")
-        - page: 頁碼 (從 1 開始)
+        - page: 頁碼 (從 1 開始)，有傳 cursor 時會被忽略
         - page_size: 每頁筆數
+        - cursor: 上一次回傳的下一頁 cursor (keyset 分頁，深頁數也不會變慢)
         返迴：
-        List[EventListView]: 活動列表 DTO 清單
+        Tuple[bytes, Optional[str]]:
+        - 已序列化成 JSON 的 EventListView 清單 (可直接當作回應內容)
+        - 下一頁的 cursor，沒有下一頁時為 None
         """
-        # 1. 計算分頁位移
+        # 0. 先查快取，命中就完全不碰資料庫
+        cache_key = (locale, page, page_size, cursor)
+        cached = _LIST_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # 1. 計算分頁位移 (或解析 cursor)
         skip = (page - 1) * page_size
+        keyset = decode_cursor(cursor) if cursor else None
         
-        # 2. 從資料庫撈取原始資料 (List[Event])
+        # 2. 從資料庫撈取原始資料 (List[Event]) 與已在 SQL 端過濾語系的翻譯
         # Repository 應該要負責處理 filter (如 status=PUBLISHED)
-        raw_events = self.repository.get_list(skip=skip, limit=page_size)
+        raw_events, translations = await self.repository.get_list_with_locale(
+            skip=skip, limit=page_size, locale=locale, cursor=keyset
+        )
+
+        # 3. 整理成 {event_id: {locale: 翻譯}}，轉換時直接查表
+        translations_map: Dict[int, Dict[str, EventTranslation]] = {}
+        for t in translations:
+            translations_map.setdefault(t.event_id, {})[t.locale] = t
+
+        # 4. 語系降級順序只需計算一次，整頁共用
+        fallback_locales = (locale, DEFAULT_LOCALE)
 
-        # 3. 資料轉換 (Mapping)
-        # 使用 List Comprehension 將每一個 Event 物件轉成 EventListView
-        return [
-            self._transform_to_list_view(event, locale) 
+        # 5. 分類資料快取 (僅限本次請求)：同分類的活動共用同一個分類 dict
+        cat_cache: Dict[int, Dict[str, str]] = {}
+
+        # 6. 資料轉換 (Mapping)
+        # 使用 List Comprehension 將每一個 Event 物件轉成 EventListView 形狀的 dict
+        rows = [
+            self._transform_to_list_view(event, translations_map.get(event.id, {}), fallback_locales, cat_cache)
             for event in raw_events
         ]
 
-    def get_event_detail(self, event_id: int, locale: str) -> EventDetailView:
+        # 整頁只在列表層級驗證一次，再序列化成 JSON bytes，之後快取命中時也直接回傳
+        payload = _LIST_ADAPTER.dump_json(_LIST_ADAPTER.validate_python(rows))
+
+        # 7. 下一頁 cursor：這頁滿了才可能有下一頁
+        next_cursor = None
+        if len(raw_events) == page_size:
+            last = raw_events[-1]
+            next_cursor = encode_cursor(last.published_at, last.id)
+
+        result = (payload, next_cursor)
+        _LIST_CACHE[cache_key] = result
+        return result
+
+    async def get_event_detail(self, event_id: int, locale: str) -> Dict[str, Any]:
         """
         取得單一活動詳情
         參數：
         - event_id: 活動 ID
         - locale: 語言代碼
         返迴：
-        EventDetailView: 活動詳情 DTO
+        Dict: EventDetailView 形狀的 dict (由 Router 的 response_model 驗證一次)
         """
         # 1. 從資料庫撈取原始資料
-        event = self.repository.get_by_id(event_id)
+        event = await self.repository.get_by_id(event_id)
 
         # 2. 錯誤處理：找不到資料
         if not event:
@@ -54,106 +133,144 @@ class EventService:
             raise HTTPException(status_code=404, detail="Event not found")
 
         # 3. 資料轉換：轉成詳情 DTO
-        return self._transform_to_detail_view(event, locale)
+        return self._transform_to_detail_view(event, (locale, DEFAULT_LOCALE))
 
     # ==========================================
     # Private Helpers (DTO 轉換邏輯)
     # ==========================================
 
     # 取得對應語言的翻譯
-    def _get_translation(self, event: Event, locale: str):
+    def _get_translation(
+        self, by_locale: Dict[str, EventTranslation], fallback_locales: Tuple[str, ...]
+    ) -> Optional[EventTranslation]:
         """
+        by_locale: {locale: 翻譯} 對照表 (依翻譯 id 順序建立)，查找都是 O(1)
+        列表與詳情共用這個規則 (列表的翻譯查詢見 EventRepository.get_list_with_locale)
         邏輯：
         1. 嘗試尋找符合 locale 的翻譯
         2. 如果找不到，退而求其次找 'zh-TW' (預設)
-        3. 再找不到，直接拿第一筆 (Fallback)
-        4. 真的都沒有，回傳空物件避免報錯
+        3. 再找不到，直接拿第一筆 (依翻譯 id，Fallback)
+        4. 真的都沒有，回傳 None 避免報錯
         """
-        # Python 的 next() 語法：在 list 中尋找第一個符合條件的元素
-        translation = next((t for t in event.translations if t.locale == locale), None)
-        
-        if not translation and event.translations:
-            # 降級策略 (Fallback)：如果指定語言沒有，試著給繁體中文，或是隨便給一個
-            translation = next((t for t in event.translations if t.locale == "zh-TW"), event.translations[0])
-            
-        return translation
+        for key in fallback_locales:
+            translation = by_locale.get(key)
+            if translation:
+                return translation
+
+        # 降級策略 (Fallback)：指定語言與繁體中文都沒有，隨便給一個
+        return next(iter(by_locale.values()), None)
     
     # 取得 JSON 欄位的多語系文字
-    def _get_json_text(self, data_dict: dict, locale: str, default: str = "Unknown") -> str:
+    def _get_json_text(self, data_dict: Optional[dict], fallback_locales: Tuple[str, ...], default: str = "Unknown") -> str:
         """
         專門處理 JSON 欄位的多語系取值小工具
+        fallback_locales: 依序嘗試的語系，例如 (指定語言, "zh-TW")
         """
-        if not data_dict:
-            return default
-            
-        # 1. 找指定的語言
-        # 2. 找不到就找繁中
-        # 3. 再找不到就回傳預設值
-        return data_dict.get(locale) or data_dict.get("zh-TW") or default
-    
-    # 轉換為列表用 DTO 
-    def _transform_to_list_view(self, event: Event, locale: str) -> EventListView:
+        # 1. 依序找指定的語言、繁中
+        # 2. 都找不到就回傳預設值
+        data_dict = data_dict or {}
+        for key in fallback_locales:
+            value = data_dict.get(key)
+            if value:
+                return value
+        return default
+
+    # 取得分類資料 (有快取就直接用)
+    def _get_category_data(
+        self, event: Event, fallback_locales: Tuple[str, ...], cat_cache: Optional[Dict[int, Dict[str, str]]] = None
+    ) -> Dict[str, str]:
         """
-        將 DB Event 轉換為 EventListView (列表用 DTO)
+        回傳 CategoryPublic 形狀的 dict (slug, name)
+        分類數量少且很少變動，同一頁的活動常常共用分類
+        cat_cache: 以 category_id 為 key 的請求內快取，None 代表不快取
         """
-        # 1. 取得對應語言的翻譯
-        trans = self._get_translation(event, locale)
-        
-        # 2. 處理可能沒有翻譯的情況
-        title = trans.title if trans else "No Translation"
-        
-        # 3. 處理分類資訊 (CategoryPublic)
-        # 注意：這裡假設 category.names 是一個 Dict，我們也要取對應語言
+        if cat_cache is not None:
+            cached = cat_cache.get(event.category_id)
+            if cached is not None:
+                return cached
 
         # 取得分類名稱
-        cat_name = self._get_json_text(event.category.names, locale, default="No Category")
+        # 注意：這裡假設 category.names 是一個 Dict，我們也要取對應語言
+        cat_name = self._get_json_text(event.category.names, fallback_locales, default="No Category")
+
+        # 組裝分類資料 (plain dict，交給列表/回應層級統一驗證)
+        category_data = {"slug": event.category.slug, "name": cat_name}
+
+        if cat_cache is not None:
+            cat_cache[event.category_id] = category_data
+        return category_data
+    
+    # 組裝列表/詳情共用的欄位
+    def _build_list_fields(
+        self,
+        event: Event,
+        trans: Optional[EventTranslation],
+        fallback_locales: Tuple[str, ...],
+        cat_cache: Optional[Dict[int, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        回傳 EventListView 所需欄位的 dict (id, slug, title, category, published_at, organizer_info)
+        列表與詳情都從這裡取基礎欄位，不必先建 DTO 再 dump 回 dict
+        trans: 已挑好語系的翻譯 (可能為 None)
+        """
+        # 1. 處理可能沒有翻譯的情況
+        title = trans.title if trans else "No Translation"
         
-        # 組裝分類 DTO
-        category_dto = CategoryPublic(
-            slug=event.category.slug,
-            name=cat_name
-        )
+        # 2. 處理分類資訊 (CategoryPublic 形狀的 dict)
+        category_data = self._get_category_data(event, fallback_locales, cat_cache)
 
-        # 4. 處理 Organizer Info (JSON -> Dict)
+        # 3. 處理 Organizer Info (JSON -> Dict)
         # 因為 DB 定義就是 JSON，SQLModel 會自動轉成 Dict，直接用即可
         # 如果是 None，DTO 有定義 Optional，所以沒問題
 
-        return EventListView(
-            id=event.id,
-            # 合成 slug，目的是讓前端路由好用一些
-            slug=f"{event.category.slug}-{event.id}", 
-            title=title,
-            category=category_dto,
-            published_at=event.published_at,
-            organizer_info=event.organizer_info
-        )
+        return {
+            "id": event.id,
+            # slug 已存在 events 表；尚未回填的舊資料才臨時合成
+            "slug": event.slug or f"{event.category.slug}-{event.id}",
+            "title": title,
+            "category": category_data,
+            "published_at": event.published_at,
+            "organizer_info": event.organizer_info,
+        }
 
-    # 轉換為詳情用 DTO
-    def _transform_to_detail_view(self, event: Event, locale: str) -> EventDetailView:
+    # 轉換為列表用資料
+    def _transform_to_list_view(
+        self,
+        event: Event,
+        by_locale: Dict[str, EventTranslation],
+        fallback_locales: Tuple[str, ...],
+        cat_cache: Optional[Dict[int, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
-        將 DB Event 轉換為 EventDetailView (詳情用 DTO)
+        將 DB Event 轉換為 EventListView 形狀的 dict (列表用)
+        by_locale: 此活動的 {locale: 翻譯} 對照表 (不會去讀 event.translations)
+        cat_cache: 分類資料的請求內快取 (見 _get_category_data)
         """
-        # 1. 先利用上面的邏輯，取得基礎欄位
-        base_view = self._transform_to_list_view(event, locale)
-        
-        # 2. 取得對應語言的翻譯 (為了拿 content 和 location)
-        trans = self._get_translation(event, locale)
-        
-        # 3. 轉換附件 (List[EventAttachment] -> List[AttachmentPublic])
+        trans = self._get_translation(by_locale, fallback_locales)
+        return self._build_list_fields(event, trans, fallback_locales, cat_cache)
+
+    # 轉換為詳情用資料
+    def _transform_to_detail_view(self, event: Event, fallback_locales: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        將 DB Event 轉換為 EventDetailView 形狀的 dict (詳情用)
+        巢狀的分類、附件也都是 plain dict，由 response_model 驗證一次即可
+        """
+        # 詳情頁會載入全部翻譯，建一次 {locale: 翻譯} 對照表
+        by_locale = {t.locale: t for t in event.translations}
+
+        # 1. 取得對應語言的翻譯 (基礎欄位的 title，以及 content 和 location 都從這裡拿)
+        trans = self._get_translation(by_locale, fallback_locales)
         
-        attachment_dtos = [
-            AttachmentPublic(
-                type=att.type, 
-                title=att.title,
-                path=att.path
-            ) for att in event.attachments
+        # 2. 轉換附件 (List[EventAttachment] -> AttachmentPublic 形狀的 dict)
+        attachments = [
+            {"type": att.type, "title": att.title or "", "path": att.path}
+            for att in event.attachments
         ]
 
-        # 4. 組裝完整 DTO
-        # 使用 model_dump() 把 base_view 轉成 dict，再解包塞進去
-        return EventDetailView(
-            **base_view.model_dump(),
-            content=trans.content if trans else None,
-            location=trans.location if trans else None,
-            attachments=attachment_dtos
-        )
\ No newline at end of file
+        # 3. 組裝完整資料
+        # 基礎欄位直接用 _build_list_fields 的 dict，不經過 EventListView
+        detail = self._build_list_fields(event, trans, fallback_locales)
+        detail["content"] = trans.content if trans else None
+        detail["location"] = trans.location if trans else None
+        detail["attachments"] = attachments
+        return detail
@@ -0,0 +1,31 @@
+-- db/migrations.sql
+-- 既有資料庫需要手動執行的 DDL (專案沒有 migration 工具，新建的資料庫可用 AUTO_CREATE_TABLES=1 建表)
+-- 重要：推送到 main 會自動部署，請先在資料庫執行對應段落再合併程式碼
+-- 每一段都標示對應的 Model 變更，依序執行
+
+-- ---------------------------------------------------------
+-- 1. 列表查詢索引 (Event.__table_args__ / EventAttachment.__table_args__)
+-- WHERE status / deleted_at + ORDER BY published_at DESC, id DESC
+-- 全部欄位同為升冪，MySQL 反向掃描即可得到 DESC, DESC 的順序，不需要 filesort
+-- ---------------------------------------------------------
+CREATE INDEX ix_events_list ON events (status, deleted_at, published_at, id);
+CREATE INDEX ix_event_attachments_event_sort ON event_attachments (event_id, sort_order);
+
+-- ---------------------------------------------------------
+-- 2. 系統時間欄位改由資料庫產生 (Event.created_at / Event.updated_at)
+-- Python 端不再提供這兩個值，欄位又是 NOT NULL，沒有預設值時 INSERT 會失敗
+-- 先補齊舊資料的 NULL，再加上預設值與 ON UPDATE
+-- ---------------------------------------------------------
+UPDATE events SET created_at = NOW() WHERE created_at IS NULL;
+UPDATE events SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE events
+    MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    MODIFY updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+
+-- ---------------------------------------------------------
+-- 3. 活動 slug 欄位 (Event.slug)
+-- 列表/詳情查詢會讀取 events.slug，沒有這個欄位時所有 API 都會回 "Unknown column"
+-- 回填格式與程式一致："{分類 slug}-{活動 id}"
+-- ---------------------------------------------------------
+ALTER TABLE events ADD COLUMN slug VARCHAR(80) NULL, ADD UNIQUE INDEX ix_events_slug (slug);
+UPDATE events e JOIN event_categories c ON c.id = e.category_id SET e.slug = CONCAT(c.slug, '-', e.id);